@@ -1,21 +1,51 @@
 from abc import ABCMeta, abstractmethod
-import collections
-import copy
+import collections.abc
+from collections import defaultdict
 import inspect
 import logging
-import re
+from operator import itemgetter
+import string
+import sys
+import types
 import typing
 from typing import (
-    Callable, Dict, List, Optional, Sequence, Set, Tuple, Type, Union
+    Any, Callable, DefaultDict, Dict, Iterable, List, Mapping, NamedTuple, Optional,
+    Sequence, Set, Tuple, Type, Union
 )
+from weakref import WeakKeyDictionary
 
 import click
-import docparse
+
+try:
+    from mypy_extensions import mypyc_attr
+except ImportError:  # only needed when compiling with mypyc
+    def mypyc_attr(*attrs, **kwattrs):  # type: ignore[misc]
+        return lambda cls: cls
+
+if typing.TYPE_CHECKING:
+    # Only needed for annotations; imported lazily by _parse_docs otherwise
+    import docparse
 
 
 LOG = logging.getLogger("ClickTypes")
-UNDERSCORES = re.compile("_")
-ALPHA_CHARS = set(chr(i) for i in tuple(range(97, 123)) + tuple(range(65, 91)))
+ALPHA_CHARS = frozenset(string.ascii_letters)
+_ALPHA_STR = string.ascii_lowercase + string.ascii_uppercase
+_CASE_OFFSET = ord("a") - ord("A")
+
+_MISSING = object()
+_NONE_TYPE = type(None)
+_SIGNATURE_CACHE: "WeakKeyDictionary[Callable, Mapping[str, inspect.Parameter]]" = \
+    WeakKeyDictionary()
+_DOCS_CACHE: "WeakKeyDictionary[Callable, Optional[docparse.DocString]]" = \
+    WeakKeyDictionary()
+_HINTS_CACHE: "WeakKeyDictionary[Callable, Dict[str, object]]" = WeakKeyDictionary()
+# Keyed by typing generic
+_RESOLVED_CACHE: "WeakKeyDictionary[Any, _ResolvedType]" = WeakKeyDictionary()
+_COLLECTION_CACHE: "WeakKeyDictionary[type, bool]" = WeakKeyDictionary()
+# Origins of Union types; also includes `X | Y` unions on Python 3.10+
+_UNION_ORIGINS = frozenset(
+    t for t in (Union, getattr(types, "UnionType", None)) if t is not None
+)
 
 
 class SignatureError(Exception):
@@ -51,6 +81,8 @@ class CompositeParameter:
         cls_or_fn: The class being decorated.
         command_kwargs: Keyword arguments to CommandBuilder.
     """
+    __slots__ = ("_cls_or_fn", "_command_kwargs")
+
     def __init__(self, cls_or_fn: Callable, command_kwargs: dict):
         self._cls_or_fn = cls_or_fn
         self._command_kwargs = command_kwargs
@@ -59,13 +91,84 @@ class CompositeParameter:
         self, param_name: str, click_command: "ClickTypesCommand",
         exclude_short_names:  Set[str]
     ):
-        kwargs = copy.copy(self._command_kwargs)
+        kwargs = dict(self._command_kwargs)
         if "exclude_short_names" in kwargs:
             exclude_short_names.update(kwargs["exclude_short_names"])
         kwargs["exclude_short_names"] = exclude_short_names
         return CompositeBuilder(self._cls_or_fn, param_name, click_command, **kwargs)
 
 
+KwargsGetter = Callable[[Dict[str, object]], Dict[str, object]]
+
+
+def _kwargs_getter(params: Tuple[str, ...]) -> KwargsGetter:
+    """Returns a function that extracts the values of `params` from a dict of
+    parameter values, as keyword arguments. Missing parameters are None.
+    """
+    if len(params) == 1:
+        name = params[0]
+
+        def get_kwargs(values):
+            return {name: values.get(name)}
+    else:
+        getter = itemgetter(*params)
+
+        def get_kwargs(values):
+            try:
+                return dict(zip(params, getter(values)))
+            except KeyError:
+                return {_param: values.get(_param) for _param in params}
+
+    return get_kwargs
+
+
+def _flatten_checks(
+    mapping: Dict[Tuple[str, ...], Sequence[Callable]]
+) -> List[Tuple[KwargsGetter, Callable]]:
+    """Flattens a conditionals/validations mapping into (get_kwargs, fn) pairs.
+    Pairs for the same params share the same getter.
+    """
+    flat: List[Tuple[KwargsGetter, Callable]] = []
+    for params, fns in mapping.items():
+        get_kwargs = _kwargs_getter(params) if params else lambda values: {}
+        flat.extend((get_kwargs, fn) for fn in fns)
+    return flat
+
+
+def _apply_conditionals(
+    ctx: click.Context, conditionals: List[Tuple[KwargsGetter, Callable]]
+):
+    """Calls each conditional function with the values of its parameters, and
+    updates `ctx.params` with any values it returns.
+    """
+    ctx_params = ctx.params
+    last_getter: Optional[KwargsGetter] = None
+    fn_kwargs: Dict[str, object] = {}
+    for get_kwargs, fn in conditionals:
+        # All functions for the same params see the values from before any of
+        # them were called
+        if get_kwargs is not last_getter:
+            fn_kwargs = get_kwargs(ctx_params)
+            last_getter = get_kwargs
+        result = fn(**fn_kwargs)
+        if result:
+            ctx_params.update(result)
+
+
+def _apply_validations(
+    ctx: click.Context, validations: List[Tuple[KwargsGetter, Callable]]
+):
+    """Calls each validation function with the values of its parameters."""
+    ctx_params = ctx.params
+    last_getter: Optional[KwargsGetter] = None
+    fn_kwargs: Dict[str, object] = {}
+    for get_kwargs, fn in validations:
+        if get_kwargs is not last_getter:
+            fn_kwargs = get_kwargs(ctx_params)
+            last_getter = get_kwargs
+        fn(**fn_kwargs)
+
+
 class CommandMixin:
     def __init__(
         self,
@@ -82,25 +185,21 @@ class CommandMixin:
 
     def parse_args(self, ctx, args):
         args = super().parse_args(ctx, args)
-
-        def _apply(l, update=False):
-            if l:
-                for params, fns in l.items():
-                    fn_kwargs = dict(
-                        (_param, ctx.params.get(_param, None))
-                        for _param in params
-                    )
-                    for fn in fns:
-                        result = fn(**fn_kwargs)
-                        if result and update:
-                            for _param, value in result.items():
-                                ctx.params[_param] = value
-
-        _apply(self.conditionals, update=True)
-        _apply(self.validations, update=False)
-
-        if self.composites:
-            for handler in self.composites.values():
+        # Read at parse time, so changes made after the command was created
+        # still take effect; most commands have none of them
+        conditionals = self.conditionals
+        validations = self.validations
+        composites = self.composites
+        if not (conditionals or validations or composites):
+            return args
+
+        if conditionals:
+            _apply_conditionals(ctx, _flatten_checks(conditionals))
+        if validations:
+            _apply_validations(ctx, _flatten_checks(validations))
+
+        if composites:
+            for handler in composites.values():
                 handler.handle_args(ctx)
 
         return args
@@ -111,6 +210,8 @@ class ClickTypesCommand(CommandMixin, click.Command):
 
 
 class WrapperType(click.ParamType):
+    __slots__ = ("name", "fn")
+
     def __init__(self, name, fn):
         self.name = name
         self.fn = fn
@@ -119,9 +220,11 @@ class WrapperType(click.ParamType):
         return self.fn(value, param, ctx)
 
 
-CONVERSIONS: Dict[Type, click.ParamType] = {}
-VALIDATIONS: Dict[Type, List[Callable]] = {}
-COMPOSITES: Dict[Type, CompositeParameter] = {}
+# Type registries
+# Keyed by type; NewTypes are functions rather than types on Python < 3.10
+CONVERSIONS: Dict[Any, click.ParamType] = {}
+VALIDATIONS: Dict[Any, List[Callable]] = defaultdict(list)
+COMPOSITES: Dict[Any, CompositeParameter] = {}
 
 
 def conversion(arg: Optional[Union[Type, Callable]] = None):
@@ -185,8 +288,6 @@ def validation(
 ):
     if inspect.isfunction(arg):
         _match_type = _get_dest_type(arg)
-        if _match_type not in VALIDATIONS:
-            VALIDATIONS[_match_type] = []
         VALIDATIONS[_match_type].append(arg)
         return arg
     else:
@@ -204,8 +305,6 @@ def validation(
             else:
                 target = f
 
-            if match_type not in VALIDATIONS:
-                VALIDATIONS[match_type] = []
             VALIDATIONS[match_type].append(target)
             return target
 
@@ -226,6 +325,274 @@ def _get_match_type(f):
     return list(params.values())[0].annotation
 
 
+def _weak_cached(cache: WeakKeyDictionary, key: Callable, factory: Callable):
+    """Returns `cache[key]`, first setting it to `factory(key)` if missing.
+    Keys that cannot be weakly referenced (e.g. builtins) are not cached.
+    """
+    try:
+        value = cache.get(key, _MISSING)
+    except TypeError:
+        return factory(key)
+    if value is _MISSING:
+        value = cache[key] = factory(key)
+    return value
+
+
+def _cached_params(f: Callable) -> Mapping[str, inspect.Parameter]:
+    """Returns the parameters of `f`'s signature, computing them at most once
+    per callable.
+    """
+    return _weak_cached(_SIGNATURE_CACHE, f, _get_params)
+
+
+def _get_params(f: Callable) -> Mapping[str, inspect.Parameter]:
+    # Callables that already carry a signature (e.g. set by another decorator)
+    # don't need to be introspected
+    sig = getattr(f, "__signature__", None)
+    if not isinstance(sig, inspect.Signature):
+        sig = inspect.signature(f)
+    return sig.parameters
+
+
+def _cached_docs(f: Callable) -> "Optional[docparse.DocString]":
+    """Returns the parsed docstring of `f` (or None if it has no docstring),
+    parsing it at most once per callable.
+    """
+    return _weak_cached(_DOCS_CACHE, f, _parse_docs)
+
+
+def _parse_docs(f: Callable) -> "Optional[docparse.DocString]":
+    # docparse is only needed once a command is built, so keep it off the
+    # import path of clicktypes
+    import docparse
+    return docparse.parse_docs(f, docparse.DocStyle.GOOGLE)
+
+
+def _cached_type_hint(f: Callable, annotation: str):
+    """Resolves the string annotation of one of `f`'s parameters in the module
+    of `f` (of its constructor if `f` is a class), evaluating each annotation
+    at most once per callable. Returns the annotation unchanged if it can't be
+    resolved.
+    """
+    hints = _weak_cached(_HINTS_CACHE, f, lambda _f: {})
+    hint = hints.get(annotation, _MISSING)
+    if hint is _MISSING:
+        hint = hints[annotation] = _eval_annotation(f, annotation)
+    return hint
+
+
+def _eval_annotation(f: Callable, annotation: str):
+    # Each annotation is evaluated on its own, unlike with
+    # typing.get_type_hints, so one bad hint doesn't hide the others, and
+    # `= None` defaults don't turn a hint into an Optional
+    target = f.__init__ if inspect.isclass(f) else f
+    try:
+        return eval(annotation, getattr(target, "__globals__", {}))
+    except Exception as err:
+        LOG.debug(f"Could not resolve type hint {annotation} of {f}: {err}")
+        return annotation
+
+
+def _normalize_mapping(
+    mapping: Optional[
+        Mapping[Union[str, Tuple[str, ...]], Union[Callable, List[Callable]]]]
+) -> Dict[Tuple[str, ...], Tuple[Callable, ...]]:
+    """Normalizes a conditionals/validations mapping so that every key is a
+    tuple of (interned) parameter names and every value is a tuple of functions.
+    """
+    if not mapping:
+        return {}
+    intern = sys.intern
+    return {
+        (tuple(intern(k_) for k_ in k) if isinstance(k, tuple) else (intern(k),)):
+            _as_fn_tuple(v)
+        for k, v in mapping.items()
+    }
+
+
+def _as_fn_tuple(
+    fns: Union[Callable, Sequence[Callable], None]
+) -> Tuple[Callable, ...]:
+    if type(fns) is tuple:
+        return fns
+    elif callable(fns):
+        return (fns,)
+    elif fns:
+        return tuple(fns)
+    else:
+        return ()
+
+
+class _ResolvedType(NamedTuple):
+    """The result of resolving a parameter's type annotation."""
+    param_type: type
+    # Only None in the results of _resolve_annotation
+    click_type: Optional[Union[click.ParamType, type]]
+    match_type: Optional[type]
+    nargs: int
+    multiple: bool
+    is_flag: bool
+    optional: bool
+    validations: Tuple[Callable, ...]
+
+
+def _primitive(param_type: type) -> _ResolvedType:
+    return _ResolvedType(
+        param_type, param_type, param_type, 1, False, param_type is bool, False, ()
+    )
+
+
+# Resolutions of the most common annotations, valid as long as nothing is
+# registered for the type
+_PRIMITIVE_FAST: Dict[type, _ResolvedType] = {
+    t: _primitive(t) for t in (int, str, float, bool)
+}
+
+
+def _resolve_param_type(param_type) -> _ResolvedType:
+    """Resolves a (non-empty, non-string) parameter annotation to the values
+    needed to create the click parameter.
+
+    Raises:
+        SignatureError if the annotation is not supported.
+    """
+    fast = _PRIMITIVE_FAST.get(param_type)
+    if (
+        fast is not None and param_type not in CONVERSIONS and
+        not VALIDATIONS.get(param_type)
+    ):
+        return fast
+    if _get_origin(param_type) is None:
+        # Plain types are cheap to resolve, and their resolution refers to the
+        # type itself, which would keep a weakly keyed cache entry alive
+        resolved = _resolve_annotation(param_type)
+    else:
+        resolved = _weak_cached(_RESOLVED_CACHE, param_type, _resolve_annotation)
+
+    # The registries are looked up on every call rather than cached, since
+    # they may change between commands
+    match_type = resolved.match_type
+    conversion = CONVERSIONS.get(match_type)
+    click_type = resolved.click_type
+    if click_type is None:
+        # Find type conversion
+        click_type = conversion or resolved.param_type
+    elif resolved.multiple:
+        # Element type of a collection; a conversion registered for the
+        # collection type itself takes precedence
+        click_type = conversion or CONVERSIONS.get(click_type) or click_type
+    return resolved._replace(
+        click_type=click_type, validations=tuple(VALIDATIONS.get(match_type, ()))
+    )
+
+
+def _resolve_annotation(param_type) -> _ResolvedType:
+    """The part of `_resolve_param_type` that only depends on the annotation
+    itself, which is cached for typing generics. For a type that needs a conversion `click_type` is
+    None (or the element type, for a collection), and `validations` is always
+    empty.
+    """
+    click_type = None
+    match_type = None
+    nargs = 1
+    multiple = False
+    optional = False
+    origin = _get_origin(param_type)
+
+    # Resolve Union attributes
+    # The only time a Union type is allowed is when it has two args and
+    # one is None (i.e. an Optional)
+    if origin in _UNION_ORIGINS:
+        filtered_args = tuple(
+            arg for arg in _get_args(param_type) if arg is not _NONE_TYPE
+        )
+        if len(filtered_args) == 1:
+            param_type = filtered_args[0]
+            optional = True
+            origin = _get_origin(param_type)
+        else:
+            raise SignatureError("Union type not supported")
+
+    # Resolve NewType
+    supertype = getattr(param_type, "__supertype__", None)
+    if supertype is not None:
+        match_type = param_type
+        # TODO: this won't work for nested type hierarchies
+        param_type = supertype
+        origin = _get_origin(param_type)
+
+    if origin is not None:
+        args = _get_args(param_type)
+        element = None
+        if origin is tuple:
+            if len(args) == 2 and args[1] is Ellipsis:
+                # Variadic Tuples take multiple values of the element type
+                element = args[0]
+            elif args and Ellipsis not in args:
+                # Tuples with specified (fixed) arguments
+                nargs = len(args)
+                click_type = click.Tuple(args)
+        elif len(args) == 1 and _is_collection(origin):
+            # Other collections of a single type, e.g. List[int]
+            element = args[0]
+        if element is not None and _get_origin(element) is None:
+            click_type = element
+        # Unwrap complex types, e.g. List[str] -> list
+        param_type = origin
+
+    # Now param_type should be primitive or an instantiable type
+    if match_type is None and not isinstance(click_type, click.Tuple):
+        match_type = param_type
+
+    # Allow multiple values when type is a non-string collection
+    if nargs == 1 and param_type != str and _is_collection(param_type):
+        multiple = True
+
+    is_flag = param_type == bool
+
+    return _ResolvedType(
+        param_type, click_type, match_type, nargs, multiple, is_flag, optional, ()
+    )
+
+
+if hasattr(typing, "get_origin"):
+    _get_origin = typing.get_origin
+    _get_args = typing.get_args
+else:
+    # Python < 3.8
+    def _get_origin(tp):
+        """Returns the unsubscripted version of a typing generic (e.g. `list`
+        for `List[str]`), `Union` for a Union, or None for any other type.
+        """
+        origin = getattr(tp, "__origin__", None)
+        if origin is Union:
+            return origin
+        # On 3.6 the concrete type is the generic's __extra__; on 3.7
+        # __origin__ is already the concrete type
+        return getattr(origin or tp, "__extra__", origin)
+
+    def _get_args(tp) -> Tuple[Any, ...]:
+        """Returns the type arguments of a typing generic, or an empty tuple."""
+        if getattr(tp, "_special", False):
+            # Unsubscripted generic on 3.7, whose __args__ are type variables
+            return ()
+        args = getattr(tp, "__args__", None) or ()
+        if getattr(tp, "__tuple_use_ellipsis__", False):
+            args += (Ellipsis,)
+        return args
+
+
+def _is_collection(param_type: type) -> bool:
+    """Returns whether `param_type` is a Collection, caching the (relatively
+    expensive) ABC subclass check per type.
+    """
+    return _weak_cached(_COLLECTION_CACHE, param_type, _check_collection)
+
+
+def _check_collection(param_type: type) -> bool:
+    return issubclass(param_type, collections.abc.Collection)
+
+
 def command(
     arg: Optional[Union[Callable, str]] = None,
     **kwargs
@@ -246,59 +613,80 @@ def command(
         return lambda f: CommandBuilder(f, arg, **kwargs).command
 
 
+# mypyc cannot compile subclasses of builtin types
+@mypyc_attr(native_class=False)
+class _ShortNameSet(set):
+    """Set of short names that are already in use. ASCII members are also
+    tracked in `bitmap` (indexed by code point), which makes the membership
+    tests during short name inference a single byte lookup. Only `add` and
+    `update` keep the bitmap in sync.
+    """
+    __slots__ = ("bitmap",)
+
+    def __init__(self, names: Iterable[str] = ()):
+        super().__init__()
+        self.bitmap = bytearray(128)
+        self.update(names)
+
+    def add(self, name: str):
+        super().add(name)
+        if len(name) == 1 and ord(name) < 128:
+            self.bitmap[ord(name)] = 1
+
+    def update(self, *others: Iterable[str]):
+        for names in others:
+            for name in names:
+                self.add(name)
+
+
+# The builders are compiled as non-native classes: mypyc mishandles **kwargs
+# forwarded to a native super().__init__ that has optional arguments, and this
+# also keeps them subclassable from interpreted code
+@mypyc_attr(native_class=False)
 class ParamBuilder(metaclass=ABCMeta):
+    __slots__ = (
+        "_wrapped", "_wrapped_name", "_func_params", "_docs", "_has_order",
+        "option_order", "_exclude_short_names", "required", "conditionals",
+        "validations", "params"
+    )
+
     def __init__(
         self,
         to_wrap: Callable,
-        func_params: Optional[Dict[str, inspect.Parameter]] = None,
-        option_order: Optional[Sequence[str]] = None,
+        func_params: Optional[Mapping[str, inspect.Parameter]] = None,
+        option_order: Optional[List[str]] = None,
         exclude_short_names: Optional[Set[str]] = None,
         required: Optional[Sequence[str]] = None,
-        conditionals: Dict[
-            Union[str, Tuple[str, ...]], Union[Callable, List[Callable]]] = None,
-        validations: Dict[
-            Union[str, Tuple[str, ...]], Union[Callable, List[Callable]]] = None,
+        conditionals: Optional[Dict[
+            Union[str, Tuple[str, ...]], Union[Callable, List[Callable]]]] = None,
+        validations: Optional[Dict[
+            Union[str, Tuple[str, ...]], Union[Callable, List[Callable]]]] = None,
         **kwargs
     ):
-        self._wrapped = to_wrap
-        self._wrapped_name = to_wrap.__name__
+        self._wrapped: Callable = to_wrap
+        self._wrapped_name: str = to_wrap.__name__
         if func_params is None:
-            func_params = inspect.signature(to_wrap).parameters
-        self._func_params = func_params
-        self._docs = docparse.parse_docs(to_wrap, docparse.DocStyle.GOOGLE)
-        self._has_order = option_order is not None
-        self.option_order = option_order or []
-        if exclude_short_names is None:
-            exclude_short_names = set()
-        self._exclude_short_names = exclude_short_names
-
-        self.required = set()
+            func_params = _cached_params(to_wrap)
+        self._func_params: Mapping[str, inspect.Parameter] = func_params
+        self._docs = _cached_docs(to_wrap)
+        self._has_order: bool = option_order is not None
+        self.option_order: List[str] = option_order or []
+        if not isinstance(exclude_short_names, _ShortNameSet):
+            exclude_short_names = _ShortNameSet(exclude_short_names or ())
+        self._exclude_short_names: _ShortNameSet = exclude_short_names
+
+        self.required: Set[str] = set()
         if required:
             self.required.update(required)
 
-        if conditionals is None:
-            self.conditionals = {}
-        else:
-            self.conditionals = dict(
-                (
-                    k if isinstance(k, tuple) else (k,),
-                    list(v) if v and not isinstance(v, list) else v
-                )
-                for k, v in conditionals.items()
-            )
-
-        if validations is None:
-            self.validations = {}
-        else:
-            self.validations = dict(
-                (
-                    k if isinstance(k, tuple) else (k,),
-                    list(v) if v and not isinstance(v, list) else v
-                )
-                for k, v in validations.items()
-            )
+        self.conditionals: Dict[Tuple[str, ...], Tuple[Callable, ...]] = \
+            _normalize_mapping(conditionals)
+        # A defaultdict while the parameters are handled; handle_params removes
+        # the default factory once the type validations have been added
+        self.validations: DefaultDict[Tuple[str, ...], Tuple[Callable, ...]] = \
+            defaultdict(tuple, _normalize_mapping(validations))
 
-        self.params = {}
+        self.params: Dict[str, click.Parameter] = {}
         self.handle_params(**kwargs)
 
     @property
@@ -306,14 +694,14 @@ class ParamBuilder(metaclass=ABCMeta):
     def command(self) -> ClickTypesCommand:
         pass
 
-    def handle_composite(self, param_name, param_type) -> bool:
+    def handle_composite(self, param_name: str, param_type) -> bool:
         return False
 
     def _get_long_name(self, param_name: str, keep_underscores: bool) -> str:
         if keep_underscores:
             return param_name
         else:
-            return UNDERSCORES.sub("-", param_name)
+            return param_name.replace("_", "-")
 
     def handle_params(
         self,
@@ -328,51 +716,66 @@ class ParamBuilder(metaclass=ABCMeta):
         argument_class: Type[click.Argument] = click.Argument,
     ):
         if short_names:
-            for short_name in short_names.keys():
-                if short_name in self._exclude_short_names:
+            for reserved in short_names.keys():
+                if reserved in self._exclude_short_names:
                     raise ParameterCollisionError(
-                        f"Short name {short_name} defined for two different parameters"
+                        f"Short name {reserved} defined for two different parameters"
                     )
-                self._exclude_short_names.add(short_name)
-
-        param_help = {}
-        if self._docs:
-            param_help = dict(
-                (p.name, str(p.description))
-                for p in self._docs.parameters.values()
-            )
+                self._exclude_short_names.add(reserved)
+
+        # Parameter docs, keyed by name; docparse returns None rather than an
+        # empty dict when the docstring has no Args section
+        param_docs = (self._docs.parameters or {}) if self._docs else {}
+
+        # Loop invariants
+        types_map = types or {}
+        short_names_map = short_names or {}
+        hidden_set = set(hidden) if hidden else ()
+        has_order = self._has_order
+        option_order_append = self.option_order.append
+        exclude = self._exclude_short_names
+        exclude_bitmap = exclude.bitmap
+        empty = inspect.Parameter.empty
+        get_long_name = self._get_long_name
 
         for param_name, param in self._func_params.items():
             if param.kind is inspect.Parameter.VAR_POSITIONAL:
-                self.command.allow_extra_arguments = True
+                # Extra arguments are not passed through to *args, so click's
+                # default of rejecting them is kept
                 continue
             elif param.kind is inspect.Parameter.VAR_KEYWORD:
                 self.command.ignore_unknown_options = False
                 continue
 
-            param_long_name = self._get_long_name(param_name, keep_underscores)
             param_type = param.annotation
             param_default = param.default
-            has_default = param.default not in {inspect.Parameter.empty, None}
-            param_optional = has_default
+            has_default = param_default is not empty and param_default is not None
 
             if param_type is None:
                 if has_default:
                     param_type = type(param_default)
                 else:
                     param_type = str
+            elif isinstance(param_type, str):
+                # Forward reference; resolve it in the wrapped callable's module
+                param_type = _cached_type_hint(self._wrapped, param_type)
 
-            if not self._has_order:
-                self.option_order.append(param_name)
+            if not has_order:
+                option_order_append(param_name)
 
+            # Composites are handled in signature order, with the other
+            # parameters, so that short names are assigned in that order
             if self.handle_composite(param_name, param_type):
                 continue
 
+            param_long_name = get_long_name(param_name, keep_underscores)
+            param_optional = has_default
             param_nargs = 1
             param_multiple = False
+            click_type: Optional[Callable]
 
-            if types and param_name in types:
-                click_type = types[param_name]
+            if param_name in types_map:
+                click_type = types_map[param_name]
                 is_flag = (
                     click_type == bool or
                     isinstance(click_type, click.types.BoolParamType)
@@ -381,10 +784,7 @@ class ParamBuilder(metaclass=ABCMeta):
                     param_nargs = len(click_type.types)
 
             else:
-                click_type = None
-                match_type = None
-
-                if param_type is inspect.Parameter.empty:
+                if param_type is empty:
                     if not has_default:
                         LOG.debug(
                             f"No type annotation or default value for paramter "
@@ -398,149 +798,116 @@ class ParamBuilder(metaclass=ABCMeta):
                             f"default value {param_default}"
                         )
                 elif isinstance(param_type, str):
-                    if param_type in globals():
-                        param_type = globals()[param_type]
-                    else:
-                        raise SignatureError(
-                            f"Could not resolve type {param_type} of paramter "
-                            f"{param_name} in function {self._wrapped_name}"
-                        )
-
-                # Resolve Union attributes
-                # The only time a Union type is allowed is when it has two args and
-                # one is None (i.e. an Optional)
-                if (
-                    hasattr(param_type, "__origin__") and
-                    param_type.__origin__ is Union
-                ):
-                    filtered_args = set(param_type.__args__)
-                    if type(None) in filtered_args:
-                        filtered_args.remove(type(None))
-                    if len(filtered_args) == 1:
-                        param_type = filtered_args.pop()
-                        param_optional = True
-                    else:
-                        raise SignatureError(
-                            f"Union type not supported for parameter {param_name} "
-                            f"in function {self._wrapped_name}"
-                        )
-
-                # Resolve NewType
-                if (
-                    inspect.isfunction(param_type) and
-                    hasattr(param_type, "__supertype__")
-                ):
-                    # It's a NewType
-                    match_type = param_type
-                    # TODO: this won't work for nested type hierarchies
-                    param_type = param_type.__supertype__
-
-                # Resolve Tuples with specified arguments
-                if (
-                    isinstance(param_type, typing.TupleMeta) and
-                    param_type.__args__
-                ):
-                    param_nargs = len(param_type.__args__)
-                    click_type = click.Tuple(param_type.__args__)
-
-                # Unwrap complex types
-                while (
-                    isinstance(param_type, typing.TypingMeta) and
-                    hasattr(param_type, '__extra__')
-                ):
-                    param_type = param_type.__extra__
-
-                # Now param_type should be primitive or an instantiable type
-
-                # Allow multiple values when type is a non-string collection
-                if (
-                    param_nargs == 1 and
-                    param_type != str and
-                    issubclass(param_type, collections.Collection)
-                ):
-                    param_multiple = True
-
-                is_flag = param_type == bool
-
-                if click_type is None:
-                    # Find type conversion
-                    if match_type is None:
-                        match_type = param_type
-                    if match_type in CONVERSIONS:
-                        click_type = CONVERSIONS[match_type]
-                    else:
-                        click_type = param_type
+                    raise SignatureError(
+                        f"Could not resolve type {param_type} of paramter "
+                        f"{param_name} in function {self._wrapped_name}"
+                    )
 
-                # Find validations
-                if param_type in VALIDATIONS:
-                    if param_name not in self.validations:
-                        self.validations[(param_name,)] = []
-                        self.validations[(param_name,)].extend(VALIDATIONS[match_type])
+                try:
+                    (
+                        param_type, click_type, match_type, param_nargs,
+                        param_multiple, is_flag, is_optional, type_validations
+                    ) = _resolve_param_type(param_type)
+                except SignatureError as err:
+                    raise SignatureError(
+                        f"{err} for parameter {param_name} in function "
+                        f"{self._wrapped_name}"
+                    ) from None
+                if is_optional:
+                    param_optional = True
+
+                if type_validations:
+                    self.validations[(param_name,)] += type_validations
 
             is_option = param_optional or positionals_as_options
+            click_param: click.Parameter
 
             if is_option:
-                short_name = None
-                if short_names and param_name in short_names:
-                    short_name = short_names[param_name]
+                short_name: Optional[str] = None
+                if param_name in short_names_map:
+                    short_name = short_names_map[param_name]
                 elif infer_short_names:
-                    for char in param_name:
-                        if char.isalpha():
-                            if char.lower() not in self._exclude_short_names:
-                                short_name = char.lower()
-                            elif char.upper() not in self._exclude_short_names:
-                                short_name = char.upper()
-                            else:
-                                continue
-                            break
-                    else:
-                        # try to select one randomly
-                        remaining = ALPHA_CHARS - self._exclude_short_names
-                        if len(remaining) == 0:
+                    # the first letter of the name that is unused in either case,
+                    # preferring lowercase
+                    short_name = next(
+                        (
+                            lc for lc in param_name.lower()
+                            if "a" <= lc <= "z" and not (
+                                exclude_bitmap[ord(lc)] and
+                                exclude_bitmap[ord(lc) - _CASE_OFFSET]
+                            )
+                        ),
+                        None
+                    )
+                    if short_name is None:
+                        # fall back to the first unused letter
+                        short_name = next(
+                            (c for c in _ALPHA_STR if not exclude_bitmap[ord(c)]),
+                            None
+                        )
+                        if short_name is None:
                             raise click.BadParameter(
                                 f"Could not infer short name for parameter {param_name}"
                             )
-                        # TODO: this may not be deterministic
-                        short_name = remaining.pop()
+                    elif exclude_bitmap[ord(short_name)]:
+                        short_name = short_name.upper()
 
-                    self._exclude_short_names.add(short_name)
+                    exclude.add(short_name)
 
                 if not is_flag:
                     long_name_str = f"--{param_long_name}"
-                elif param_long_name.startswith("no-"):
+                elif param_long_name[:3] == "no-":
                     long_name_str = f"--{param_long_name[3:]}/--{param_long_name}"
                 else:
                     long_name_str = f"--{param_long_name}/--no-{param_long_name}"
-                param_decls = [long_name_str]
-                if short_name:
-                    param_decls.append(f"-{short_name}")
+                param_decls = (
+                    (long_name_str, f"-{short_name}") if short_name
+                    else (long_name_str,)
+                )
 
-                param = option_class(
-                    param_decls,
+                # Only pass the arguments that differ from click's defaults.
+                # show_default is always passed, since in click 8 its default
+                # (None) defers to the context settings.
+                option_kwargs = dict(
                     type=click_type,
                     required=not param_optional,
                     default=param_default,
-                    show_default=show_defaults,
-                    nargs=param_nargs,
-                    hide_input=hidden and param_name in hidden,
-                    is_flag=is_flag,
-                    multiple=param_multiple,
-                    help=param_help.get(param_name, None)
+                    show_default=show_defaults
                 )
+                if param_nargs != 1:
+                    option_kwargs["nargs"] = param_nargs
+                if param_name in hidden_set:
+                    option_kwargs["hide_input"] = True
+                if is_flag:
+                    option_kwargs["is_flag"] = True
+                if param_multiple:
+                    option_kwargs["multiple"] = True
+                param_doc = param_docs.get(param_name)
+                if param_doc is not None:
+                    option_kwargs["help"] = str(param_doc.description)
+
+                click_param = option_class(param_decls, **option_kwargs)
             else:
-                param = argument_class(
-                    [param_long_name],
+                click_param = argument_class(
+                    (param_long_name,),
                     type=click_type,
                     default=param_default,
                     nargs=-1 if param_nargs == 1 and param_multiple else param_nargs
                 )
                 # TODO: where to show parameter help?
-                # help = param_help.get(param_name, None)
+                # help = param_docs.get(param_name, None)
+
+            self.params[param_name] = click_param
 
-            self.params[param_name] = param
+        # Disabled in place, so a command created with this mapping sees the
+        # final validations
+        self.validations.default_factory = None
 
 
+@mypyc_attr(native_class=False)
 class CompositeBuilder(ParamBuilder):
+    __slots__ = ("param_name", "_prefix", "_click_command", "_arg_name_map")
+
     def __init__(
         self,
         to_wrap: Callable,
@@ -549,10 +916,11 @@ class CompositeBuilder(ParamBuilder):
         **kwargs
     ):
         self.param_name = param_name
+        self._prefix = f"{param_name}_"
         self._click_command = click_command
         func_params = None
         if inspect.isclass(to_wrap):
-            func_params = dict(inspect.signature(to_wrap.__init__).parameters)
+            func_params = dict(_cached_params(to_wrap.__init__))
             func_params.pop("self")
         super().__init__(to_wrap, func_params, **kwargs)
 
@@ -561,10 +929,19 @@ class CompositeBuilder(ParamBuilder):
         return self._click_command
 
     def _get_long_name(self, param_name: str, keep_underscores: bool) -> str:
-        return super()._get_long_name(
-            f"{self.param_name}_{param_name}",
-            keep_underscores
-        )
+        long_name = self._prefix + param_name
+        if keep_underscores:
+            return long_name
+        else:
+            return long_name.replace("_", "-")
+
+    def handle_params(self, **kwargs):
+        super().handle_params(**kwargs)
+        # Names under which the composite's values appear in ctx.params
+        self._arg_name_map = [
+            (composite_param_name, self._get_long_name(composite_param_name, True))
+            for composite_param_name in self.params.keys()
+        ]
 
     def handle_args(self, ctx):
         """
@@ -573,14 +950,22 @@ class CompositeBuilder(ParamBuilder):
         Args:
             ctx:
         """
-        kwargs = {}
-        for composite_param_name in self.params.keys():
-            arg_name = self._get_long_name(composite_param_name, True)
-            kwargs[composite_param_name] = ctx.params.pop(arg_name, None)
-        ctx.params[self.param_name] = self._wrapped(**kwargs)
+        params = ctx.params
+        pop = params.pop
+        kwargs = {
+            composite_param_name: pop(arg_name, None)
+            for composite_param_name, arg_name in self._arg_name_map
+        }
+        params[self.param_name] = self._wrapped(**kwargs)
 
 
+@mypyc_attr(native_class=False)
 class CommandBuilder(ParamBuilder):
+    __slots__ = (
+        "_name", "_command_class", "_click_command", "composites",
+        "_composite_types", "_extra_click_kwargs"
+    )
+
     def __init__(
         self,
         to_wrap: Callable,
@@ -592,8 +977,9 @@ class CommandBuilder(ParamBuilder):
     ):
         self._name = name
         self._command_class = command_class
-        self._click_command = None
-        self.composites = {}
+        # Created by handle_params
+        self._click_command: ClickTypesCommand
+        self.composites: Dict[str, CompositeBuilder] = {}
         self._composite_types = composite_types or {}
         self._extra_click_kwargs = extra_click_kwargs or {}
         super().__init__(to_wrap, **kwargs)
@@ -606,13 +992,12 @@ class CommandBuilder(ParamBuilder):
     def command(self) -> ClickTypesCommand:
         return self._click_command
 
-    def handle_composite(self, param_name, param_type) -> bool:
-        if param_name in self._composite_types:
-            composite_param = self._composite_types[param_name]
-        elif param_type in COMPOSITES:
-            composite_param = COMPOSITES[param_type]
-        else:
-            return False
+    def handle_composite(self, param_name: str, param_type) -> bool:
+        composite_param = self._composite_types.get(param_name)
+        if composite_param is None:
+            composite_param = COMPOSITES.get(param_type)
+            if composite_param is None:
+                return False
         builder = composite_param(
             param_name, self.command, self._exclude_short_names
         )
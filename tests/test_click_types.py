@@ -1,8 +1,9 @@
 import sys
+import click
 import pytest
 
 
-from typing import Optional
+from typing import List, Optional, Set, Tuple
 import clicktypes
 
 
@@ -50,6 +51,8 @@ def simple(foo: Foo, *args, bar: int = 1, baz: Optional[float] = None, **kwargs)
 
 
 class CliTest:
+    __slots__ = ("args", "fn", "expected")
+
     def __init__(self, args, fn, expected):
         self.args = args
         self.fn = fn
@@ -79,3 +82,180 @@ def test_cli(test_case):
     except SystemExit:
         pass
     assert SIMPLE_RESULT == test_case.expected
+
+
+def test_infer_short_names_fallback():
+    @clicktypes.command()
+    def short(x: int = 1, xx: int = 2, xxx: int = 3):
+        pass
+
+    short_opts = dict((p.name, p.opts[1]) for p in short.params)
+    assert short_opts == dict(x="-x", xx="-X", xxx="-a")
+
+
+def test_string_annotations():
+    @clicktypes.command()
+    def forward_ref(foo: "Foo", count: "int" = 1):
+        pass
+
+    params = dict((p.name, p) for p in forward_ref.params)
+    assert set(params) == {"foo_a", "foo_b", "count"}
+    assert params["count"].type == click.INT
+
+
+def test_conditionals_and_validations():
+    calls = []
+
+    def check_bar(bar):
+        calls.append(("check_bar", bar))
+
+    def fill_baz(bar, baz, missing):
+        calls.append(("fill_baz", bar, baz, missing))
+        return dict(baz=bar * 2)
+
+    @clicktypes.command(
+        conditionals={("bar", "baz", "missing"): fill_baz},
+        validations={"bar": [check_bar]}
+    )
+    def checked(bar: int = 1, baz: int = 0):
+        calls.append(("checked", bar, baz))
+
+    checked.main(["--bar", "3"], standalone_mode=False)
+    assert calls == [
+        ("fill_baz", 3, 0, None),
+        ("check_bar", 3),
+        ("checked", 3, 6)
+    ]
+
+
+def test_plain_command_skips_post_processing():
+    calls = []
+
+    @clicktypes.command()
+    def plain(bar: int = 1, verbose: bool = False):
+        calls.append((bar, verbose))
+
+    assert not (plain.conditionals or plain.validations or plain.composites)
+    plain.main(["--bar", "2", "--verbose"], standalone_mode=False)
+    assert calls == [(2, True)]
+
+    # Checks added after the command was created are still applied
+    plain.validations[("bar",)] = (lambda bar: calls.append(("check", bar)),)
+    plain.main(["--bar", "3"], standalone_mode=False)
+    assert calls[1:] == [("check", 3), (3, False)]
+
+
+def test_direct_registry_writes():
+    class Celsius(float):
+        pass
+
+    @clicktypes.command()
+    def before(temp: Celsius = 0.0):
+        pass
+
+    click_type = clicktypes.WrapperType("Celsius", lambda v, p, c: Celsius(v))
+    clicktypes.CONVERSIONS[Celsius] = click_type
+
+    @clicktypes.command()
+    def after(temp: Celsius = 0.0):
+        pass
+
+    assert before.params[0].type is not click_type
+    assert after.params[0].type is click_type
+
+
+def test_composite_short_names_in_signature_order():
+    @clicktypes.command()
+    def ordered(bar: int = 1, foo: Foo = None):
+        pass
+
+    short_opts = dict((p.name, p.opts[-1]) for p in ordered.params)
+    assert short_opts["bar"] == "-b"
+    assert short_opts["foo_b"] == "-B"
+
+
+def test_variadic_tuple():
+    result = {}
+
+    @clicktypes.command()
+    def variadic(a: Tuple[int, ...] = ()):
+        result["a"] = a
+
+    variadic.main(["--a", "12", "--a", "3"], standalone_mode=False)
+    assert result["a"] == (12, 3)
+
+
+def test_collection_element_types():
+    result = {}
+
+    @clicktypes.command()
+    def collections(q: List[int] = (), s: Set[float] = ()):
+        result.update(q=q, s=s)
+
+    collections.main(
+        ["--q", "1", "--q", "2", "--s", "0.5"], standalone_mode=False
+    )
+    assert result == dict(q=(1, 2), s=(0.5,))
+
+
+def test_show_defaults_passed_to_options():
+    @clicktypes.command()
+    def quiet(count: int = 3):
+        pass
+
+    @clicktypes.command(show_defaults=True)
+    def loud(count: int = 3):
+        pass
+
+    # False rather than click 8's None, which defers to the context settings
+    assert quiet.params[0].show_default is False
+    assert loud.params[0].show_default is True
+
+
+def test_docstring_without_args():
+    @clicktypes.command()
+    def undocumented(count: int = 1):
+        """Hi."""
+
+    assert undocumented.help == "Hi."
+    assert undocumented.params[0].help is None
+
+
+def test_conditionals_modified_between_commands():
+    result = {}
+    conditionals = {"x": lambda x: dict(x=x + 1)}
+
+    def record(x: int = 0):
+        result["x"] = x
+
+    first = clicktypes.command(conditionals=conditionals)(record)
+    conditionals["x"] = lambda x: dict(x=x + 100)
+    second = clicktypes.command(conditionals=conditionals)(record)
+
+    first.main(["--x", "1"], standalone_mode=False)
+    assert result["x"] == 2
+    second.main(["--x", "1"], standalone_mode=False)
+    assert result["x"] == 101
+
+
+def test_var_positional_rejects_extra_args():
+    @clicktypes.command()
+    def star(a: int, *args):
+        pass
+
+    with pytest.raises(click.UsageError):
+        star.main(["1", "extra1", "extra2"], standalone_mode=False)
+
+
+def test_unresolvable_string_annotation():
+    with pytest.raises(clicktypes.SignatureError, match="Nope of paramter a"):
+        @clicktypes.command()
+        def bad(b: "int" = 2, a: "Nope" = 1):  # noqa: F821
+            pass
+
+    @clicktypes.command()
+    def none_default(x: "int" = None, y: int = None):
+        pass
+
+    params = dict((p.name, p) for p in none_default.params)
+    assert type(params["x"]) is type(params["y"])